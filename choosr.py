@@ -1,40 +1,96 @@
 #!/usr/bin/env python3
+import bisect
 import fnmatch
-import tldextract
-import urllib
+import functools
+import re
 import subprocess
 import sys
 import logging
-logging.basicConfig(level=logging.INFO, filename='log.txt')
 
 def launch_chrome(profile_dir, url=None):
     # Profile dirs are in ~/.var/app/com.google.Chrome/config/google-chrome/
     command = ["/usr/bin/flatpak","run","--branch=stable","--arch=x86_64","--command=/app/bin/chrome","--file-forwarding","com.google.Chrome",f"--profile-directory={profile_dir}"]
     if url is not None:
         command.append(url)
-    logging.info("%s", str(command))
-    subprocess.run(command)
+    logging.info("%s", command)
+    # Hand off to the browser and return; choosr shouldn't linger until it exits
+    subprocess.Popen(command, start_new_session=True, stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+@functools.lru_cache(maxsize=None)
+def get_extractor():
+    # tldextract is only needed once there is a URL to route, so keep its
+    # import (and public suffix list setup) off the no-argument launch path
+    import tldextract
+    return tldextract.TLDExtract()
 
 def get_matchers(filename):
-    return open(filename, 'rt').read().splitlines()
+    with open(filename, 'rt', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def reverse_labels(domain):
+    return '.'.join(reversed(domain.split('.')))
+
+
+class DomainMatcher:
+    # Plain "*.example.com" rules are kept as a sorted tuple of reversed
+    # suffixes ("com.example") so a lookup is a bisect per domain label
+    # rather than an fnmatch per rule. Any other globs are translated and
+    # joined into one alternation, each in a named group so the rule that
+    # matched can be reported. The "rule" prefix can't clash with the "gN"
+    # groups fnmatch.translate emits on Python < 3.11.
+    def __init__(self, match_globs):
+        suffixes = []
+        self.globs = []
+        for match_glob in match_globs:
+            suffix = match_glob[2:]
+            if match_glob.startswith('*.') and not any(c in suffix for c in '*?['):
+                suffixes.append((reverse_labels(suffix), match_glob))
+            else:
+                self.globs.append(match_glob)
+        suffixes.sort()
+        self.suffix_keys = tuple(key for key, _ in suffixes)
+        self.suffix_globs = tuple(match_glob for _, match_glob in suffixes)
+        self.globs_re = None
+        if self.globs:
+            self.globs_re = re.compile('|'.join(
+                f'(?P<rule{i}>{fnmatch.translate(match_glob)})'
+                for i, match_glob in enumerate(self.globs)))
+
+    def match(self, domain):
+        labels = domain.split('.')
+        # "*.X" only matches when X is a proper suffix of the domain
+        for start in range(len(labels) - 1, 0, -1):
+            key = reverse_labels('.'.join(labels[start:]))
+            index = bisect.bisect_left(self.suffix_keys, key)
+            if index < len(self.suffix_keys) and self.suffix_keys[index] == key:
+                return self.suffix_globs[index]
+        if self.globs_re is not None:
+            m = self.globs_re.match(domain)
+            if m is not None:
+                return self.globs[int(m.lastgroup[4:])]
+        return None
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, filename='log.txt')
     profile = "Default"
 
     if len(sys.argv) == 1:
         logging.info("No URL provided - launching Chrome")
         launch_chrome(profile)
+        return
 
     url = sys.argv[1]
-    parsed = tldextract.extract(url)
+    parsed = get_extractor()(url)
     domain = parsed.registered_domain
-    logging.info(f"{url=} => {parsed=} => {domain=}")
+    logging.info("url=%r => parsed=%r => domain=%r", url, parsed, domain)
 
-    for match_glob in get_matchers("work.txt"):
-        if fnmatch.fnmatch(domain, match_glob):
-            profile = "Profile 5"
-            logging.info(f"{url} matched {match_glob} -> {profile}")
+    match_glob = DomainMatcher(get_matchers("work.txt")).match(domain)
+    if match_glob is not None:
+        profile = "Profile 5"
+        logging.info("%s matched %s -> %s", url, match_glob, profile)
 
     launch_chrome(profile, url=url)
 